@@ -3,10 +3,22 @@
 #   subclasses to alter the type of objects that will be created
 
 from abc import ABC, abstractmethod
+from array import array
+import sys
+import time
 
 
 # create base class
+# - subclasses register themselves under a name, e.g. class Square(Shape, name='square')
 class Shape(ABC):
+    __slots__ = ()
+    registry = {}
+    
+    def __init_subclass__(cls, name: str = None, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if name is not None:
+            Shape.registry[name.lower()] = cls
+    
     @abstractmethod
     def calc_area(self):
         pass
@@ -17,9 +29,15 @@ class Shape(ABC):
 
 
 # create subclasses
-class Square(Shape):
+# - area = factor * dimension ** 2 and circumference = factor * dimension, the
+#   factors are used by ShapeBatch
+class Square(Shape, name='square'):
+    __slots__ = ('width',)
+    shape_type = 'square'
+    area_factor = 1
+    circumference_factor = 4
+    
     def __init__(self, width: int) -> None:
-        self.shape_type = 'square'
         self.width = width
     
     def __str__(self) -> str:
@@ -31,10 +49,14 @@ class Square(Shape):
     def calc_circumference(self) -> int:
         return self.width * 4
 
-class Circle(Shape):
+class Circle(Shape, name='circle'):
+    __slots__ = ('radius',)
+    shape_type = 'circle'
+    pi = 3.1415926535
+    area_factor = pi
+    circumference_factor = pi * 2
+    
     def __init__(self, radius: int) -> None:
-        self.shape_type = 'circle'
-        self.pi = 3.1415926535
         self.radius = radius
         
     def __str__(self) -> str:
@@ -50,14 +72,87 @@ class Circle(Shape):
 # create factory
 # - allows to easily add new types of subclasses
 # - avoids tight coupling between base, sub and creator classes 
+# - new subclasses only need to register with Shape, the factory stays untouched
+# - normalized names are cached, so lookups skip lower() after the first call
 class Factory:
+    _names = {}
+    
+    def _resolve(self, name: str) -> type:
+        try:
+            return self._names[name]
+        except KeyError:
+            cls = Shape.registry[name.lower()]
+            self._names[name] = cls
+            return cls
+    
     def create_shape(self, name: str, width: int) -> Shape:
-        localizer = {
-            'square': Square,
-            'circle': Circle
-        }
-        
-        return localizer[name.lower()](width)
+        return self._resolve(name)(width)
+    
+    def create_many(self, names: list, widths: list) -> list:
+        # resolve every distinct name once, then construct without lookups
+        classes = {name: self._resolve(name) for name in set(names)}
+        return [classes[name](width) for name, width in zip(names, widths)]
+
+
+# create batch of shapes
+# - keeps typed columns (dimension and shape type code) instead of one object
+#   per shape
+# - areas and circumferences are computed column-wise from the class factors
+class ShapeBatch:
+    def __init__(self, shapes: list, types: array, dims: array) -> None:
+        self.shapes = shapes
+        self.types = types
+        self.dims = dims
+    
+    @classmethod
+    def from_factory(cls, names: list, dims: list, factory: Factory = None) \
+        -> 'ShapeBatch':
+            factory = factory or Factory()
+            shapes = []
+            codes = {}
+            for name in set(names):
+                shape = factory._resolve(name)
+                if shape not in shapes:
+                    shapes.append(shape)
+                codes[name] = shapes.index(shape)
+            
+            types = array('B', [codes[name] for name in names])
+            return cls(shapes, types, array('d', dims))
+    
+    def calc_area(self) -> array:
+        factors = [shape.area_factor for shape in self.shapes]
+        return array('d', [d * d * factors[t] for d, t in zip(self.dims, self.types)])
+    
+    def calc_circumference(self) -> array:
+        factors = [shape.circumference_factor for shape in self.shapes]
+        return array('d', [d * factors[t] for d, t in zip(self.dims, self.types)])
+
+
+def benchmark(n: int = 1000000) -> None:
+    factory = Factory()
+    names = ['Circle', 'Square'] * (n // 2)
+    widths = list(range(n))
+    
+    start = time.perf_counter()
+    shapes = [factory.create_shape(name, width) for name, width in zip(names, widths)]
+    print(f'create_shape: {n / (time.perf_counter() - start):.0f} shapes/s')
+    
+    del shapes
+    start = time.perf_counter()
+    shapes = factory.create_many(names, widths)
+    print(f'create_many: {n / (time.perf_counter() - start):.0f} shapes/s')
+    
+    start = time.perf_counter()
+    areas = [shape.calc_area() for shape in shapes]
+    print(f'calc_area: {n / (time.perf_counter() - start):.0f} shapes/s')
+    
+    batch = ShapeBatch.from_factory(names, widths, factory)
+    start = time.perf_counter()
+    batch_areas = batch.calc_area()
+    print(f'ShapeBatch.calc_area: {n / (time.perf_counter() - start):.0f} shapes/s')
+    print(f'results match: {list(batch_areas) == areas}')
+    circumferences = [shape.calc_circumference() for shape in shapes]
+    print(f'results match: {list(batch.calc_circumference()) == circumferences}')
 
 
 # run method
@@ -75,4 +170,8 @@ if __name__ == '__main__':
         
         print(created_shape)
         print(f'\tarea: {created_shape.calc_area()}')
-        print(f'\tcircumference: {created_shape.calc_circumference()}')
\ No newline at end of file
+        print(f'\tcircumference: {created_shape.calc_circumference()}')
+    
+    print([str(s) for s in shape_factory.create_many(shapes, [1, 2])])
+    if '--benchmark' in sys.argv:
+        benchmark()
\ No newline at end of file
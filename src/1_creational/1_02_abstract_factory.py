@@ -3,9 +3,15 @@
 #   concrete classes -> easy way to produce similar type of many objects
 
 from abc import ABC, abstractmethod
+import sys
+import tracemalloc
 
 # create base class
+# - meals are stateless and immutable (no instance attributes), so one instance
+#   per type can be shared between orders
 class Meal(ABC):
+    __slots__ = ()
+    
     @abstractmethod
     def cook(self):
         pass
@@ -13,8 +19,8 @@ class Meal(ABC):
 
 # create subclasses
 class Pizza(Meal):
-    def __init__(self) -> None:
-        self.meal_type = 'pizza'
+    __slots__ = ()
+    meal_type = 'pizza'
 
     def __str__(self) -> str:
         return self.meal_type
@@ -23,8 +29,8 @@ class Pizza(Meal):
         print(f'Italian main course prepared: {self.meal_type.title()}')
 
 class Tiramisu(Meal):
-    def __init__(self) -> None:
-        self.meal_type = 'tiramisu'
+    __slots__ = ()
+    meal_type = 'tiramisu'
 
     def __str__(self) -> str:
         return self.meal_type
@@ -33,8 +39,8 @@ class Tiramisu(Meal):
         print(f'Italian dessert course prepared: {self.meal_type.title()}')
         
 class Schnitzel(Meal):
-    def __init__(self) -> None:
-        self.meal_type = 'schnitzel'
+    __slots__ = ()
+    meal_type = 'schnitzel'
 
     def __str__(self) -> str:
         return self.meal_type
@@ -43,8 +49,8 @@ class Schnitzel(Meal):
         print(f'Austrian main course prepared: {self.meal_type.title()}')
 
 class Apfelstruddel(Meal):
-    def __init__(self) -> None:
-        self.meal_type = 'apfelstruddel'
+    __slots__ = ()
+    meal_type = 'apfelstruddel'
 
     def __str__(self) -> str:
         return self.meal_type
@@ -57,37 +63,81 @@ class Apfelstruddel(Meal):
 # - easy to introduce new types of subclasses
 # - easy to create families of related objects
 # - assures compatibility between objects of factory
+# - shared factories hand out one cached instance per meal type instead of
+#   allocating a new meal on every call
 class Factory(ABC):
+    # each concrete factory declares its family of meals
+    @property
     @abstractmethod
-    def get_meal(self, meal_type: str) -> None:
+    def meals(self) -> dict:
         pass
+    
+    def __init__(self, shared: bool = False) -> None:
+        self.shared = shared
+        self._cache = {}
+    
+    def get_meal(self, meal_type: str) -> Meal:
+        meal_type = meal_type.lower()
+        if not self.shared:
+            return self.meals[meal_type]()
+        
+        meal = self._cache.get(meal_type)
+        if meal is None:
+            meal = self._cache[meal_type] = self.meals[meal_type]()
+        return meal
 
 class ItalianMealFactory(Factory):
-    def get_meal(self, meal_type: str) -> object:
-        localizer = {
-            'main': Pizza,
-            'dessert': Tiramisu
-        }
-
-        return localizer[meal_type.lower()]()
+    meals = {
+        'main': Pizza,
+        'dessert': Tiramisu
+    }
 
 class AustrianMealFactory(Factory):
-    def get_meal(self, meal_type: str) -> object:
-        localizer = {
-            'main': Schnitzel,
-            'dessert': Apfelstruddel
-        }
-
-        return localizer[meal_type.lower()]()
+    meals = {
+        'main': Schnitzel,
+        'dessert': Apfelstruddel
+    }
 
+# - factory instances are cached per type, get_meals() serves whole orders
 class FactoryProducer:
-    def get_factory(self, factory_type: str) -> object:
-        localizer = {
-            'italian': ItalianMealFactory,
-            'austrian': AustrianMealFactory
-        }
-
-        return localizer[factory_type.lower()]()
+    factories = {
+        'italian': ItalianMealFactory,
+        'austrian': AustrianMealFactory
+    }
+    
+    def __init__(self, shared: bool = False) -> None:
+        self.shared = shared
+        self._cache = {}
+    
+    def get_factory(self, factory_type: str) -> Factory:
+        factory_type = factory_type.lower()
+        if not self.shared:
+            return self.factories[factory_type]()
+        
+        factory = self._cache.get(factory_type)
+        if factory is None:
+            factory = self._cache[factory_type] = \
+                self.factories[factory_type](shared=True)
+        return factory
+    
+    def get_meals(self, pairs: list) -> list:
+        return [
+            self.get_factory(factory_type).get_meal(meal_type)
+            for factory_type, meal_type in pairs
+        ]
+
+
+def benchmark(orders: int = 100000) -> None:
+    pairs = [('italian', 'main'), ('austrian', 'dessert')] * (orders // 2)
+    for shared in (False, True):
+        fp = FactoryProducer(shared=shared)
+        tracemalloc.start()
+        meals = [fp.get_factory(c).get_meal(t) for c, t in pairs]
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        mode = 'shared' if shared else 'fresh'
+        print(f'{mode}: {peak / orders:.1f} bytes per order, '
+              f'{len(set(map(id, meals)))} distinct meals')
 
 # run methdod
 if __name__ == '__main__':
@@ -101,4 +151,10 @@ if __name__ == '__main__':
         
         for dish_type in dish_types:
             meal = factory.get_meal(dish_type)
-            meal.cook()
\ No newline at end of file
+            meal.cook()
+    
+    for meal in FactoryProducer(shared=True).get_meals([('austrian', 'main')]):
+        meal.cook()
+    
+    if '--benchmark' in sys.argv:
+        benchmark()
\ No newline at end of file
@@ -5,6 +5,10 @@
 #   various object creation problems
 
 from abc import ABC, abstractmethod
+import io
+import json
+import sys
+import time
 
 # create base class
 class Robot:
@@ -15,33 +19,77 @@ class Robot:
         self.flying = False
         self.traversal = []
         self.detection_systems = []
+        self.blueprint = None
 
     def __str__(self):
-        string = ""
+        # robots stamped from a blueprint share its memoized description
+        if self.blueprint is not None:
+            return self.blueprint.render()
+        return self._render()
+
+    def _render(self) -> str:
+        return "".join(self.iter_chunks())
+
+    # stream the description in chunks instead of building one big string
+    def iter_chunks(self):
         if self.bipedal:
-            string += "BIPEDAL "
+            yield "BIPEDAL "
         if self.quadripedal:
-            string += "QUADRIPEDAL "
+            yield "QUADRIPEDAL "
         if self.flying:
-            string += "FLYING ROBOT "
+            yield "FLYING ROBOT "
         if self.wheeled:
-            string += "ROBOT ON WHEELS\n"
+            yield "ROBOT ON WHEELS\n"
         else:
-            string += "ROBOT\n"
+            yield "ROBOT\n"
 
         if self.traversal:
-            string += "Traversal modules installed:\n"
+            yield "Traversal modules installed:\n"
 
         for module in self.traversal:
-            string += "- " + str(module) + "\n"
+            yield "- " + str(module) + "\n"
 
         if self.detection_systems:
-            string += "Detection systems installed:\n"
+            yield "Detection systems installed:\n"
 
         for system in self.detection_systems:
-            string += "- " + str(system) + "\n"
+            yield "- " + str(system) + "\n"
+
+    def to_dict(self) -> dict:
+        return {
+            "bipedal": self.bipedal,
+            "quadripedal": self.quadripedal,
+            "wheeled": self.wheeled,
+            "flying": self.flying,
+            "traversal": [str(module) for module in self.traversal],
+            "detection_systems": [str(system) for system in self.detection_systems]
+        }
+
+    def write_to(self, fp, json_lines: bool = False) -> None:
+        if json_lines:
+            fp.write(json.dumps(self.to_dict()) + "\n")
+        elif self.blueprint is not None:
+            fp.write(self.blueprint.render())
+        else:
+            for chunk in self.iter_chunks():
+                fp.write(chunk)
+
 
-        return string
+# create stamped robot class
+# - robots stamped from a blueprint share its memoized description
+# - assigning any field turns the robot back into a plain Robot, so its
+#   description is rendered from its own state again
+# - plain robots don't pay for the check on every assignment
+class StampedRobot(Robot):
+    def __setattr__(self, name, value):
+        object.__setattr__(self, "__class__", Robot)
+        self.blueprint = None
+        setattr(self, name, value)
+
+
+def write_fleet(robots, fp, json_lines: bool = False) -> None:
+    for robot in robots:
+        robot.write_to(fp, json_lines)
 
 
 # create modules
@@ -150,6 +198,73 @@ class Director:
         builder.build_detection_system()
         return builder.get_product()
 
+    def compile_blueprint(self, builder) -> 'Blueprint':
+        builder.reset()
+        builder.build_traversal()
+        builder.build_detection_system()
+        blueprint = Blueprint(builder.get_product())
+        builder.reset()
+        return blueprint
+
+
+# create blueprint class
+# - director records the builder steps once into an immutable recipe
+# - stamping robots from the recipe skips the per-step method dispatch and
+#   shares the stateless module instances between all robots
+# - description is rendered once per recipe
+class Blueprint:
+    def __init__(self, product: Robot) -> None:
+        self.bipedal = product.bipedal
+        self.quadripedal = product.quadripedal
+        self.wheeled = product.wheeled
+        self.flying = product.flying
+        self.traversal = tuple(product.traversal)
+        self.detection_systems = tuple(product.detection_systems)
+        self._rendered = None
+
+    def stamp(self, n: int = 1) -> list:
+        state = {
+            "bipedal": self.bipedal,
+            "quadripedal": self.quadripedal,
+            "wheeled": self.wheeled,
+            "flying": self.flying,
+            "traversal": self.traversal,
+            "detection_systems": self.detection_systems,
+            "blueprint": self
+        }
+        robots = []
+        for _ in range(n):
+            # skip __init__ and __setattr__, the fields come from the recipe
+            robot = object.__new__(StampedRobot)
+            robot.__dict__.update(state)
+            robots.append(robot)
+        return robots
+
+    def render(self) -> str:
+        if self._rendered is None:
+            robot = self.stamp()[0]
+            self._rendered = robot._render()
+        return self._rendered
+
+
+def benchmark(n: int = 100000) -> None:
+    builder = AndroidBuilder()
+    fleet = []
+    for _ in range(n):
+        builder.reset()
+        fleet.append(Director().make_android(builder))
+
+    start = time.perf_counter()
+    manifest = "".join(str(robot) for robot in fleet)
+    io.StringIO().write(manifest)
+    print(f"str(robot): {n / (time.perf_counter() - start):.0f} robots/s")
+
+    for json_lines in (False, True):
+        start = time.perf_counter()
+        write_fleet(fleet, io.StringIO(), json_lines)
+        name = "write_fleet(json_lines)" if json_lines else "write_fleet"
+        print(f"{name}: {n / (time.perf_counter() - start):.0f} robots/s")
+
 
 # run method
 if __name__ == "__main__":
@@ -169,4 +284,13 @@ if __name__ == "__main__":
     
     director = Director()
     builder = AndroidBuilder()
-    print(director.make_android(builder))
\ No newline at end of file
+    print(director.make_android(builder))
+
+    blueprint = director.compile_blueprint(AutonomousCarBuilder())
+    fleet = blueprint.stamp(3)
+    print(fleet[0])
+    print(fleet[0].traversal[0] is fleet[2].traversal[0])
+
+    write_fleet(fleet, sys.stdout, json_lines=True)
+    if "--benchmark" in sys.argv:
+        benchmark()
\ No newline at end of file
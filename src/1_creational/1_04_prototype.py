@@ -5,6 +5,13 @@
 
 from abc import ABC, abstractmethod
 from copy import deepcopy
+import mmap
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
 
 # create prototype class
 # - keeps number of subclasses to a minimum
@@ -27,6 +34,188 @@ class HugeDataObject(Prototype):
         return deepcopy(self)
 
 
+# create copy-on-write subclass
+# - clones share the underlying buffer until the first write, so cloning costs
+#   the same regardless of the payload size
+# - owners counter is shared by all objects using the same buffer
+class CowDataObject(Prototype):
+    def __init__(self, data: bytes) -> None:
+        self._buffer = bytearray(data)
+        self._owners = [1]
+    
+    def __str__(self) -> str:
+        return f'object data size: {len(self._buffer)}'
+    
+    def __del__(self) -> None:
+        self._owners[0] -= 1
+    
+    @property
+    def data(self) -> memoryview:
+        return memoryview(self._buffer).toreadonly()
+    
+    def shares_storage(self) -> bool:
+        return self._owners[0] > 1
+    
+    def write(self, offset: int, data: bytes) -> None:
+        # writes never resize the buffer, readers may hold a memoryview of it
+        if offset < 0 or offset + len(data) > len(self._buffer):
+            raise IndexError('write outside of the data buffer')
+        if self.shares_storage():
+            self._owners[0] -= 1
+            self._buffer = bytearray(self._buffer)
+            self._owners = [1]
+        self._buffer[offset:offset + len(data)] = data
+    
+    def clone(self) -> object:
+        clone = object.__new__(type(self))
+        clone._buffer = self._buffer
+        clone._owners = self._owners
+        self._owners[0] += 1
+        return clone
+
+
+# create memory-mapped subclass
+# - payload stays in a local file and is mapped lazily, so pages are only
+#   loaded when read
+# - the prototype is a read-only mapping, so it always matches the file
+# - each clone is a fresh private (copy-on-write) mapping of the same file ->
+#   cloning costs O(1) regardless of payload size, writes never reach the file
+# - clones may have been written, so only the read-only prototype can be cloned
+class MappedDataObject(Prototype):
+    def __init__(self, path: str, writable: bool = False) -> None:
+        self.path = path
+        self.writable = writable
+        access = mmap.ACCESS_COPY if writable else mmap.ACCESS_READ
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # empty files can't be mapped
+                self.data = bytearray() if writable else b''
+            else:
+                self.data = mmap.mmap(f.fileno(), 0, access=access)
+    
+    def __str__(self) -> str:
+        # size of the mapping, no pages are touched
+        return f'object data size: {len(self.data)}'
+    
+    def __enter__(self) -> object:
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+    
+    def clone(self) -> object:
+        if self.writable:
+            raise TypeError('only the read-only prototype can be cloned')
+        return type(self)(self.path, writable=True)
+
+# create prototype registry
+# - stores named prototypes so callers don't have to keep the originals
+# - keeps a bounded pool of ready-made clones per name, refilled by a
+#   background thread so acquire() rarely has to clone on the hot path
+# - released clones are recycled only when a reset hook is registered, otherwise
+#   they are dropped
+class PrototypeRegistry:
+    def __init__(self, pool_size: int = 8) -> None:
+        self.pool_size = pool_size
+        self.stats = {
+            'hits': 0, 'misses': 0, 'refills': 0, 'refill_errors': 0,
+            'refill_time': 0.0
+        }
+        self._prototypes = {}
+        self._resets = {}
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._closed = False
+        self._worker = threading.Thread(target=self._refill, daemon=True)
+        self._worker.start()
+    
+    def register(self, name: str, prototype: Prototype, reset=None) -> None:
+        with self._lock:
+            self._prototypes[name] = prototype
+            self._resets[name] = reset
+            self._pools[name] = queue.Queue(maxsize=self.pool_size)
+        self._wanted.set()
+    
+    def acquire(self, name: str) -> object:
+        try:
+            clone = self._pools[name].get_nowait()
+            hit = True
+        except queue.Empty:
+            clone = self._prototypes[name].clone()
+            hit = False
+        with self._lock:
+            self.stats['hits' if hit else 'misses'] += 1
+        self._wanted.set()
+        return clone
+    
+    def release(self, name: str, clone: object) -> None:
+        # without a reset hook a used clone can't be trusted -> drop it
+        reset = self._resets[name]
+        if reset is None:
+            return
+        reset(clone)
+        try:
+            self._pools[name].put_nowait(clone)
+        except queue.Full:
+            pass
+    
+    def close(self) -> None:
+        self._closed = True
+        self._wanted.set()
+        self._worker.join()
+    
+    def _refill(self) -> None:
+        while True:
+            self._wanted.wait()
+            self._wanted.clear()
+            if self._closed:
+                return
+            with self._lock:
+                pools = [(self._prototypes[n], p) for n, p in self._pools.items()]
+            for prototype, pool in pools:
+                while not pool.full():
+                    start = time.perf_counter()
+                    try:
+                        clone = prototype.clone()
+                    except Exception:
+                        # keep the worker alive, acquire() falls back to cloning
+                        with self._lock:
+                            self.stats['refill_errors'] += 1
+                        break
+                    try:
+                        pool.put_nowait(clone)
+                    except queue.Full:
+                        break
+                    with self._lock:
+                        self.stats['refills'] += 1
+                        self.stats['refill_time'] += time.perf_counter() - start
+
+
+def _rss() -> int:
+    # current resident set size in bytes, 0 where /proc is not available
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return 0
+
+def benchmark(size: int = 10000000, clones: int = 10) -> None:
+    for prototype in (HugeDataObject(bytearray(size)), CowDataObject(bytes(size))):
+        rss = _rss()
+        start = time.perf_counter()
+        copies = [prototype.clone() for _ in range(clones)]
+        elapsed = time.perf_counter() - start
+        grown = _rss() - rss
+        print(f'{type(prototype).__name__}: {elapsed / clones * 1e6:.1f}us per '
+              f'clone, RSS +{grown / 2**20:.1f} MiB for {len(copies)} clones')
+        del copies
+
+
 # run method
 if __name__ == '__main__':
     # create prototype object
@@ -37,4 +226,28 @@ if __name__ == '__main__':
     
     # print objects
     print(prototype)
-    print(clone)
\ No newline at end of file
+    print(clone)
+    
+    cow = CowDataObject(b'a' * 1000000)
+    cow_clone = cow.clone()
+    print(cow_clone.shares_storage())
+    cow_clone.write(0, b'b')
+    print(cow_clone.shares_storage(), bytes(cow.data[:1]), bytes(cow_clone.data[:1]))
+    
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(b'a' * 1000000)
+    with MappedDataObject(f.name) as mapped, mapped.clone() as mapped_clone:
+        mapped_clone.data[0:1] = b'b'
+        print(mapped, mapped_clone, mapped.data[0:1], mapped_clone.data[0:1])
+    os.remove(f.name)
+    
+    registry = PrototypeRegistry(pool_size=4)
+    registry.register('huge', HugeDataObject('a' * 1000000))
+    time.sleep(0.1)
+    obj = registry.acquire('huge')
+    registry.release('huge', obj)
+    print(obj, registry.stats)
+    registry.close()
+    
+    if '--benchmark' in sys.argv:
+        benchmark()
\ No newline at end of file
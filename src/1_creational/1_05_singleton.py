@@ -2,14 +2,27 @@
 #   provides one and only one instance of a particular class or object type
 
 from abc import ABC, abstractmethod
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
 
 
 # create singleton class
 # - only initialized when it is requested the first time
 # - global access to instance of the object
 # - can't have more than one instance of the object
+# - double-checked locking: only the first creation takes the lock, later reads
+#   are a plain attribute lookup
+# - one instance per subclass, looked up in the class' own __dict__
+# - initialize() must not look up its own singleton, the re-entrant call is
+#   detected and raises instead of recursing
 class Singleton():
     __instance__ = None
+    __lock__ = threading.RLock()
+    __creating__ = set()
     
     # error when second instance is created
     # def __init__(self):
@@ -20,18 +33,167 @@ class Singleton():
     
     # return existing instance when second instance is created
     def __new__(cls):
-        # If there is no instance create one
-        if cls.__instance__ is None:
-            cls.__instance__ = super(Singleton, cls).__new__(cls)
+        instance = cls.__dict__.get('__instance__')
+        if instance is None:
+            with Singleton.__lock__:
+                # If there is still no instance create one
+                instance = cls.__dict__.get('__instance__')
+                if instance is None:
+                    # only the thread holding the lock can get here again
+                    if cls in Singleton.__creating__:
+                        raise RuntimeError(
+                            f'{cls.__name__}.initialize() must not look up its '
+                            'own singleton'
+                        )
+                    Singleton.__creating__.add(cls)
+                    try:
+                        instance = super(Singleton, cls).__new__(cls)
+                        instance.initialize()
+                        cls.__instance__ = instance
+                    finally:
+                        Singleton.__creating__.discard(cls)
 
         # If another call is made, return the first instance 
-        return cls.__instance__
+        return instance
+    
+    # lazy initialization hook, runs exactly once per subclass
+    def initialize(self) -> None:
+        pass
+
+    @classmethod
+    def get_instance(cls) -> object:
+        instance = cls.__dict__.get('__instance__')
+        if instance is None:
+            instance = cls()
+        return instance
+
+
+# hold the lock across fork, so a child never inherits it mid-creation, and give
+# the child a fresh lock
+def _before_fork() -> None:
+    Singleton.__lock__.acquire()
+
+def _after_fork_in_parent() -> None:
+    Singleton.__lock__.release()
+
+def _after_fork_in_child() -> None:
+    Singleton.__lock__ = threading.RLock()
+
+os.register_at_fork(
+    before=_before_fork,
+    after_in_parent=_after_fork_in_parent,
+    after_in_child=_after_fork_in_child
+)
+
+
+# create fork-aware singleton
+# - expensive read-only state is built once in the parent and published in a
+#   shared memory block, so forked workers map the same pages instead of
+#   keeping their own copy
+# - after fork only per-process handles are re-created in reset_handles()
+# - close() needs every memoryview taken from state to be released first and
+#   drops the instance, so the next lookup builds a fresh one
+class SharedStateSingleton(Singleton):
+    def initialize(self) -> None:
+        data = self.build_state()
+        self._owner = os.getpid()
+        self._size = len(data)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        self._shm.buf[:len(data)] = data
+        self.reset_handles()
+        os.register_at_fork(after_in_child=self._after_fork)
+    
+    # builds the read-only state, runs once in the parent
+    @classmethod
+    def build_state(cls) -> bytes:
+        return b''
+    
+    # re-creates per-process handles, runs at startup and in every forked child
+    def reset_handles(self) -> None:
+        pass
+    
+    @property
+    def state(self) -> memoryview:
+        if self._shm is None:
+            raise ValueError(f'{type(self).__name__} is closed')
+        return self._shm.buf[:self._size].toreadonly()
+    
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+        except BufferError:
+            raise BufferError(
+                f'release all {type(self).__name__}.state views before close()'
+            ) from None
+        if os.getpid() == self._owner:
+            self._shm.unlink()
+        self._shm = None
+        with Singleton.__lock__:
+            if type(self).__dict__.get('__instance__') is self:
+                type(self).__instance__ = None
+    
+    def _after_fork(self) -> None:
+        if self._shm is not None:
+            self.reset_handles()
+
+
+def benchmark(threads: int = 64, calls: int = 10000) -> None:
+    class Config(Singleton):
+        def initialize(self) -> None:
+            time.sleep(0.01)
+    
+    seen = set()
+    def hammer() -> None:
+        for _ in range(calls):
+            seen.add(id(Config.get_instance()))
+    
+    workers = [threading.Thread(target=hammer) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    print(f'{threads} threads: {threads * calls / elapsed:.0f} get_instance() '
+          f'calls/s, {len(seen)} instance(s)')
+
+
+def _proportional_rss() -> int:
+    # proportional set size in KiB -> shared pages are split between processes
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1])
+    return 0
 
-    @staticmethod
-    def get_instance() -> object:
-        if not Singleton.__instance__:
-            Singleton()
-        return Singleton.__instance__
+def _worker_rss(shared: bool) -> int:
+    if shared:
+        state = LookupTable.get_instance().state
+    else:
+        state = LookupTable.build_state()
+    sum(state[::4096])
+    return _proportional_rss()
+
+class LookupTable(SharedStateSingleton):
+    @classmethod
+    def build_state(cls) -> bytes:
+        return bytes(range(256)) * (1 << 18)
+
+def fork_benchmark(workers: int = 16) -> None:
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print('fork benchmark needs /proc/self/smaps_rollup')
+        return
+    
+    table = LookupTable.get_instance()
+    context = multiprocessing.get_context('fork')
+    for shared in (False, True):
+        with context.Pool(workers) as pool:
+            total = sum(pool.map(_worker_rss, [shared] * workers, chunksize=1))
+        mode = 'shared memory' if shared else 'per-process copy'
+        print(f'{mode}: {total / 1024:.1f} MiB total PSS across {workers} workers')
+    table.close()
 
 
 # run method
@@ -41,4 +203,13 @@ if __name__ == '__main__':
     
     print(s)
     print(s1)
-    print(s == s1)
\ No newline at end of file
+    print(s == s1)
+    
+    class Logger(Singleton):
+        pass
+    
+    print(Logger.get_instance() is Logger(), Logger() is s)
+    
+    if '--benchmark' in sys.argv:
+        benchmark()
+        fork_benchmark()
\ No newline at end of file
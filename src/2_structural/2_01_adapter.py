@@ -3,6 +3,12 @@
 #   between them -> allows to use existing classes with new interfaces
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import sys
+import threading
+import time
 
 
 # create existing base class
@@ -46,6 +52,83 @@ class SvgAdapter(PngInterface):
         img = self.rasterize()
         print('drawing ' + img)
 
+# create caching object adapter
+# - rasterized images are kept in an LRU cache keyed on the source image
+#   identity or content hash, bounded by a memory budget in bytes
+# - counters for hit rate and rasterization time help sizing the cache
+class RasterCache:
+    def __init__(self, budget: int = 64 * 2**20, key: str = 'content'):
+        self.budget = budget
+        self.key = key
+        self.used = 0
+        self.stats = {'hits': 0, 'misses': 0, 'raster_time': 0.0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        
+    def make_key(self, svg: SvgImage):
+        if self.key == 'identity':
+            return id(svg)
+        # image class is part of the key, it decides what get_image() returns
+        return (type(svg), hashlib.sha1(repr(svg.svg).encode()).hexdigest())
+    
+    def hit_rate(self) -> float:
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+    
+    def get(self, svg: SvgImage):
+        key = self.make_key(svg)
+        with self._lock:
+            entry = self._entries.get(key)
+            # ids are reused once an image is collected -> check the source
+            if entry is not None and self.key == 'identity' and entry[0] is not svg:
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+    
+    def put(self, svg: SvgImage, img: str, raster_time: float) -> None:
+        key = self.make_key(svg)
+        # identity entries hold the source, so its id can't be reused meanwhile
+        source = svg if self.key == 'identity' else None
+        size = sys.getsizeof(img)
+        with self._lock:
+            self.stats['raster_time'] += raster_time
+            if size > self.budget:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.used -= sys.getsizeof(old[1])
+            self._entries[key] = (source, img)
+            self.used += size
+            while self.used > self.budget:
+                _, (_, old_img) = self._entries.popitem(last=False)
+                self.used -= sys.getsizeof(old_img)
+
+class CachingSvgAdapter(SvgAdapter):
+    def __init__(self, svg, cache: RasterCache):
+        super().__init__(svg)
+        self.cache = cache
+        
+    def rasterize(self) -> str:
+        img = self.cache.get(self.svg)
+        if img is None:
+            start = time.perf_counter()
+            img = super().rasterize()
+            self.cache.put(self.svg, img, time.perf_counter() - start)
+        return img
+
+def draw_many(images: list, cache: RasterCache, workers: int = 4) -> None:
+    adapters = [CachingSvgAdapter(img, cache) for img in images]
+    # rasterize cache misses in parallel, then draw in the original order
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        rasterized = list(pool.map(CachingSvgAdapter.rasterize, adapters))
+    for img in rasterized:
+        print('drawing ' + img)
+
+
 # create class adapter
 # - only be implemented in languages that support multiple inheritance
 #   -> inheriting all of their functionalities
@@ -55,7 +138,17 @@ class ConvertingNonVector(Exception):
     # exception used to check whether image can be rasterized
     pass
 
+# - draw path is picked once per image class and format and cached, so ordinary
+#   images don't go through exceptions
+# - every adapter subclass gets its own cache, so its rasterize() override is
+#   used for vector images
 class ClassAdapter(PngImage, SvgImage):
+    _strategies = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._strategies = {}
+    
     def __init__(self, image: object):
         self.image = image
         
@@ -64,13 +157,44 @@ class ClassAdapter(PngImage, SvgImage):
             return "rasterized " + self.image.get_image()
         else:
             raise ConvertingNonVector
+    
+    @classmethod
+    def strategy(cls, image: object):
+        # format is an instance attribute -> part of the key
+        key = (type(image), image.format)
+        draw = cls._strategies.get(key)
+        if draw is None:
+            if image.format == "vector":
+                draw = lambda img: "drawing " + cls(img).rasterize()
+            else:
+                draw = lambda img: "drawing " + img.get_image()
+            cls._strategies[key] = draw
+        return draw
         
     def draw(self) -> str:
+        print(self.strategy(self.image)(self.image))
+    
+    @classmethod
+    def draw_stream(cls, images):
+        for image in images:
+            yield cls.strategy(image)(image)
+
+
+def benchmark(n: int = 1000000) -> None:
+    images = [PngImage('data')] * (n * 9 // 10) + [SvgImage('data')] * (n // 10)
+    
+    start = time.perf_counter()
+    for image in images:
         try:
-            img = self.rasterize()
-            print("drawing " + img)
-        except ConvertingNonVector as e:
-            print("drawing " + self.image.get_image())
+            img = ClassAdapter(image).rasterize()
+        except ConvertingNonVector:
+            img = image.get_image()
+    print(f'exceptions: {n / (time.perf_counter() - start):.0f} images/s')
+    
+    start = time.perf_counter()
+    for _ in ClassAdapter.draw_stream(images):
+        pass
+    print(f'draw_stream: {n / (time.perf_counter() - start):.0f} images/s')
 
 
 # run method
@@ -83,4 +207,14 @@ if __name__ == '__main__':
     example_adapter.draw()
     
     example_adapter = ClassAdapter(example_svg)
-    example_adapter.draw()
\ No newline at end of file
+    example_adapter.draw()
+    
+    cache = RasterCache(budget=2**20)
+    draw_many([example_svg, SvgImage('other data'), example_svg], cache)
+    print(f'hit rate: {cache.hit_rate():.2f}, stats: {cache.stats}')
+    
+    for line in ClassAdapter.draw_stream([regular_png, example_svg]):
+        print(line)
+    
+    if '--benchmark' in sys.argv:
+        benchmark()
\ No newline at end of file
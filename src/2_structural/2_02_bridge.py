@@ -4,6 +4,7 @@
 #   decouple an abstraction from its implementation
 
 from abc import ABC, abstractmethod
+import sys
 
 
 # create base classes
@@ -11,15 +12,26 @@ class Material(ABC):
     @abstractmethod
     def __str__(self):
         pass
+
+# - stateless materials opt in to sharing one interned instance per class,
+#   materials with constructor arguments stay ordinary classes
+class StatelessMaterial(Material):
+    _instances = {}
+    
+    def __new__(cls):
+        instance = StatelessMaterial._instances.get(cls)
+        if instance is None:
+            instance = StatelessMaterial._instances[cls] = super().__new__(cls)
+        return instance
         
-class Cobblestone(Material):
+class Cobblestone(StatelessMaterial):
     def __init__(self):
         pass
     
     def __str__(self):
         return 'cobblestone'
         
-class Wood(Material):
+class Wood(StatelessMaterial):
     def __init__(self):
         pass
     
@@ -32,26 +44,44 @@ class Wood(Material):
 #   abstraction from its implementation so that the two can vary independently
 # - does not violate Open/Closed principle because at any time new abstractions
 #   can be introduces as well as implementations independently from each other
+# - prefix per building class and material name is formatted once and reused
 class Building(ABC):
+    _prefixes = {}
+    
+    @property
     @abstractmethod
-    def print_name(self) -> None:
+    def kind(self) -> str:
         pass
+    
+    def render(self) -> str:
+        key = (type(self), str(self.material))
+        prefix = Building._prefixes.get(key)
+        if prefix is None:
+            prefix = Building._prefixes[key] = f'{self.material} {self.kind} '
+        return prefix + self.name
+    
+    def print_name(self) -> None:
+        print(self.render())
         
 class Tower(Building):
+    kind = 'tower'
+    
     def __init__(self, name, material):
         self.name = name
         self.material = material
         
-    def print_name(self) -> str:
-        print(str(self.material) + ' tower ' + self.name)
-        
 class Mill(Building):
+    kind = 'mill'
+    
     def __init__(self, name, material):
         self.name = name
         self.material = material
-        
-    def print_name(self) -> str:
-        print(str(self.material) + ' mill ' + self.name)
+
+
+def render_all(buildings, out=None) -> None:
+    # writes all buildings through one buffered stream instead of print per building
+    out = out or sys.stdout
+    out.writelines(building.render() + '\n' for building in buildings)
 
 
 # run method
@@ -66,4 +96,7 @@ if __name__ == '__main__':
     cobblestone_tower.print_name()
     wood_tower.print_name()
     cobblestone_mill.print_name()
-    wood_mill.print_name()
\ No newline at end of file
+    wood_mill.print_name()
+    
+    render_all([cobblestone_tower, wood_mill])
+    print(Wood() is Wood())
\ No newline at end of file
@@ -3,24 +3,90 @@
 #   -> allows to treat individual objects and compositions of objects uniformly
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+import multiprocessing
+import sys
+import time
 
 
 # create base class
+# - every item knows its parent box, so changes only invalidate its ancestors
 class Item(ABC):
+    parent = None
+    
     @abstractmethod
     def return_price(self) -> None:
         pass
     
+    def _invalidate(self) -> None:
+        # a valid box only has valid children, so stop at the first invalid one
+        box = self.parent
+        while box is not None and box._subtotal is not None:
+            box._subtotal = None
+            box = box.parent
+    
 # create first leaf class level
+# - caches its subtotal, repeated queries cost O(1) and updates O(depth)
 class Box(Item):
     def __init__(self, contents):
-        self.contents = contents
+        self._contents = []
+        self._subtotal = None
+        for item in contents:
+            self.add(item)
+    
+    # read-only view, use add(), remove() and move() so cached subtotals stay
+    # valid
+    @property
+    def contents(self) -> tuple:
+        return tuple(self._contents)
+    
+    def add(self, item: Item) -> None:
+        # an item lives in one box only, use move() to take it from another box
+        if item.parent is not None:
+            raise ValueError('item already belongs to a box, use move()')
+        item.parent = self
+        self._contents.append(item)
+        item._invalidate()
+    
+    def remove(self, item: Item) -> None:
+        self._contents.remove(item)
+        item._invalidate()
+        item.parent = None
+    
+    def move(self, item: Item) -> None:
+        if item.parent is not None:
+            item.parent.remove(item)
+        self.add(item)
         
     def return_price(self) -> int:
-        price = 0
-        for item in self.contents:
-            price = price + item.return_price()
-        return price
+        # explicit stack instead of recursion, children are filled in first
+        stack = [(self, False)]
+        while stack:
+            box, expanded = stack.pop()
+            if expanded:
+                price = 0
+                for item in box._contents:
+                    price = price + item.return_price()
+                box._subtotal = price
+            elif box._subtotal is None:
+                stack.append((box, True))
+                stack.extend(
+                    (item, False) for item in box._contents
+                    if isinstance(item, Box) and item._subtotal is None
+                )
+        return self._subtotal
+
+# - leaf price changes invalidate the cached subtotals above it
+class Product(Item):
+    @property
+    def price(self) -> int:
+        return self._price
+    
+    @price.setter
+    def price(self, price: int) -> None:
+        self._price = price
+        self._invalidate()
 
 # create second leaf class level
 # - with introduction of new elements, classes and interfaces are allowed into
@@ -28,21 +94,21 @@ class Box(Item):
 # - create less numbers of objects as compared to ordinary methods
 # - provides flexibility of structure with manageable class or interface as it
 #   defines class hierarchies that contains primitive and complex objects
-class Phone(Item):
+class Phone(Product):
     def __init__(self, price: int):
         self.price = price
         
     def return_price(self) -> int:
         return self.price
 
-class Charger(Item):
+class Charger(Product):
     def __init__(self, price: int):
         self.price = price
         
     def return_price(self) -> int:
         return self.price
 
-class Earphones(Item):
+class Earphones(Product):
     def __init__(self, price: int):
         self.price = price
         
@@ -50,6 +116,82 @@ class Earphones(Item):
         return self.price
 
 
+# create traversal engine
+# - explicit stack instead of recursion -> deep trees don't hit the recursion
+#   limit and don't pay a Python frame per node
+# - parallel mode folds the top-level subtrees in forked worker processes, so
+#   the tree itself is never pickled
+def walk(root: Item):
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        yield item
+        if isinstance(item, Box):
+            stack.extend(reversed(item._contents))
+
+def fold(root: Item, func, initial):
+    return reduce(func, walk(root), initial)
+
+def map_items(root: Item, func):
+    return map(func, walk(root))
+
+def filter_items(root: Item, predicate):
+    return filter(predicate, walk(root))
+
+_fork_state = {}
+
+def _fold_subtree(index: int):
+    root, func, identity = _fork_state['args']
+    return fold(root._contents[index], func, identity)
+
+# - subtrees are folded from `identity` and merged with `combine`, `initial` is
+#   applied once for the root -> same result as fold() as long as
+#   combine(acc, fold(subtree, func, identity)) == fold(subtree, func, acc)
+# - falls back to folding the subtrees in this process where fork is not
+#   available (e.g. Windows)
+def parallel_fold(root: Box, func, combine, initial, identity,
+                  workers: int = None):
+    total = func(initial, root)
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        for item in root._contents:
+            total = combine(total, fold(item, func, identity))
+        return total
+    
+    _fork_state['args'] = (root, func, identity)
+    try:
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for result in pool.map(_fold_subtree, range(len(root._contents))):
+                total = combine(total, result)
+    finally:
+        _fork_state.clear()
+    return total
+
+def _add_price(total: int, item: Item) -> int:
+    return total if isinstance(item, Box) else total + item.return_price()
+
+def _recursive_price(item: Item) -> int:
+    if isinstance(item, Box):
+        return sum(_recursive_price(i) for i in item._contents)
+    return item.return_price()
+
+def benchmark(n: int = 10**7, fanout: int = 10) -> None:
+    # full tree with n leaves and `fanout` children per box
+    level = [Phone(1) for _ in range(n)]
+    while len(level) > 1:
+        level = [Box(level[i:i + fanout]) for i in range(0, len(level), fanout)]
+    root = level[0]
+    
+    for name, run in (
+        ('recursive', lambda: _recursive_price(root)),
+        ('fold', lambda: fold(root, _add_price, 0)),
+        ('parallel_fold', lambda: parallel_fold(root, _add_price, int.__add__, 0, 0))
+    ):
+        start = time.perf_counter()
+        price = run()
+        print(f'{name}: {price} in {time.perf_counter() - start:.2f}s')
+
+
 # run method
 if __name__ == '__main__':
     # create objects
@@ -59,4 +201,20 @@ if __name__ == '__main__':
     box = Box([phone, charger, earphones])
     
     # print price
-    print(box.return_price())
\ No newline at end of file
+    print(box.return_price())
+    
+    # change price, add and move items, only ancestors are recomputed
+    phone.price = 450
+    box.add(Box([Charger(30)]))
+    print(box.return_price())
+    Box([]).move(earphones)
+    print(box.return_price())
+    
+    # deep nesting no longer hits the recursion limit
+    deep = Phone(1)
+    for _ in range(100000):
+        deep = Box([deep])
+    print(deep.return_price(), fold(deep, _add_price, 0))
+    
+    if '--benchmark' in sys.argv:
+        benchmark(10**6)
\ No newline at end of file
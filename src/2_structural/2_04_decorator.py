@@ -3,38 +3,134 @@
 #   implementation by placing these objects inside the wrapper objects that
 #   contains the behaviors
 
+import io
+import os
+import sys
+import time
+import tracemalloc
+
 class WrittenText:
     def __init__(self, text: str):
         self._text = text
+        self._version = 0
+
+    # changing the text bumps the version, which invalidates memoized renders
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, text: str) -> None:
+        self._text = text
+        self._version += 1
 
     def render(self) -> str:
         return self._text
 
-class UnderlineWrapper(WrittenText):
-    def __init__(self, wrapped):
+# - wrapper chain is compiled once into a single prefix/suffix pair around the
+#   innermost text, so a render is one join instead of one f-string per layer
+# - rendered result is memoized until the inner text changes
+# - only plain WrittenText and tag wrappers are flattened, any other wrapped
+#   object keeps its own render() and is rendered on every call
+class TagWrapper(WrittenText):
+    tag = ''
+
+    def __init__(self, wrapped: WrittenText):
         self._wrapped = wrapped
-    
+        self._prefix = f'<{self.tag}>'
+        self._suffix = f'</{self.tag}>'
+        if isinstance(wrapped, TagWrapper) and \
+                type(wrapped).render is TagWrapper.render:
+            self._inner = wrapped._inner
+            self._base = wrapped._base
+            self._prefix += wrapped._prefix
+            self._suffix = wrapped._suffix + self._suffix
+        elif type(wrapped) is WrittenText:
+            self._inner = wrapped
+            self._base = None
+        else:
+            self._inner = None
+            self._base = wrapped
+        self._rendered = None
+        self._rendered_version = None
+
     def render(self) -> str:
-        return f'<u>{self._wrapped.render()}</u>'
+        inner = self._inner
+        if inner is None:
+            return ''.join((self._prefix, self._base.render(), self._suffix))
+        if self._rendered_version != inner._version:
+            self._rendered = ''.join((self._prefix, inner._text, self._suffix))
+            self._rendered_version = inner._version
+        return self._rendered
+
+class UnderlineWrapper(TagWrapper):
+    tag = 'u'
 
 
 # create wrapper
 # - easy to divide a monolithic class which implements many possible variants
 #   of behavior into several classes using the Decorator method
 # - add or remove the responsibilities from an object at runtime
-class ItalicWrapper(WrittenText):
-    def __init__(self, wrapped: str):
-        self._wrapped = wrapped
+class ItalicWrapper(TagWrapper):
+    tag = 'i'
 
-    def render(self):
-        return f'<i>{self._wrapped.render()}</i>'
+class BoldWrapper(TagWrapper):
+    tag = 'b'
 
-class BoldWrapper(WrittenText):
-    def __init__(self, wrapped: str):
-        self._wrapped = wrapped
 
-    def render(self) -> str:
-        return f'<b>{self._wrapped.render()}</b>'
+# create reusable style
+# - captures a wrapper stack once and applies it to many texts without
+#   creating wrapper instances per snippet
+class Style:
+    def __init__(self, *wrappers: type):
+        # outermost wrapper first, e.g. Style(ItalicWrapper, BoldWrapper)
+        self.prefix = ''.join(f'<{w.tag}>' for w in wrappers)
+        self.suffix = ''.join(f'</{w.tag}>' for w in reversed(wrappers))
+
+    @classmethod
+    def from_wrapper(cls, wrapper: TagWrapper) -> 'Style':
+        if wrapper._inner is None or type(wrapper).render is not TagWrapper.render:
+            raise ValueError('wrapper chain contains custom decorators')
+        style = cls()
+        style.prefix = wrapper._prefix
+        style.suffix = wrapper._suffix
+        return style
+
+    def apply(self, texts):
+        prefix, suffix = self.prefix, self.suffix
+        for text in texts:
+            yield prefix + text + suffix
+
+    def write(self, texts, out, sep: str = '\n') -> None:
+        # bytes buffers get encoded output, text streams get str
+        if isinstance(out, (io.RawIOBase, io.BufferedIOBase)):
+            prefix, suffix = self.prefix.encode(), (self.suffix + sep).encode()
+            out.writelines(prefix + text.encode() + suffix for text in texts)
+        else:
+            prefix, suffix = self.prefix, self.suffix + sep
+            out.writelines(prefix + text + suffix for text in texts)
+
+
+def benchmark(n: int = 1000000) -> None:
+    texts = [f'snippet {i}' for i in range(n)]
+    style = Style(ItalicWrapper, UnderlineWrapper, BoldWrapper)
+
+    runs = (
+        ('wrappers', lambda out: out.writelines(
+            ItalicWrapper(UnderlineWrapper(BoldWrapper(WrittenText(t)))).render()
+            + '\n' for t in texts
+        )),
+        ('style', lambda out: style.write(texts, out))
+    )
+    for name, run in runs:
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as out:
+            run(out)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{name}: {n / elapsed:.0f} snippets/s, peak {peak / 1024:.1f} KiB')
 
 
 # run method
@@ -43,4 +139,16 @@ if __name__ == '__main__':
     after_gfg = ItalicWrapper(UnderlineWrapper(BoldWrapper(before_gfg)))
 
     print(f'before : {before_gfg.render()}')
-    print(f'after : {after_gfg.render()}' )
\ No newline at end of file
+    print(f'after : {after_gfg.render()}' )
+
+    before_gfg.text = 'hello again!'
+    print(f'changed : {after_gfg.render()}')
+
+    style = Style.from_wrapper(after_gfg)
+    print(list(style.apply(['first', 'second'])))
+    buffer = io.BytesIO()
+    style.write(['third'], buffer)
+    print(buffer.getvalue())
+
+    if '--benchmark' in sys.argv:
+        benchmark()
\ No newline at end of file
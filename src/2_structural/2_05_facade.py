@@ -3,7 +3,15 @@
 #   easier way to access methods of the underlying system by providing a
 #   single entry point
 
+import json
+import os
 import random
+import sys
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import compress
 
 
 # create "complex" system
@@ -37,12 +45,15 @@ class Dove:
     def __str__(self):
         return self.asset
         
+# - works in place: pairs are read by index, the dead are compacted out with a
+#   write pointer and offspring are appended after the pass, so no generation
+#   allocates a full-size copy of the population
 def iteration(specimen: list) -> list:
     half = len(specimen)//2
-    spec1 = specimen[:half]
-    spec2 = specimen[half:]
     
-    for s1, s2 in zip(spec1, spec2):
+    for i in range(half):
+        s1 = specimen[i]
+        s2 = specimen[half + i]
         move1 = s1.move()
         move2 = s2.move()
         
@@ -63,16 +74,21 @@ def iteration(specimen: list) -> list:
             elif move2 == 'deflect':
                 s1.alive = False
                 s2.alive = False
-                
-    s = spec1 + spec2
-    s = [x for x in s if x.alive == True]
     
-    for spec in s:
-        if spec.reproducing == True:
-            s.append(spec.reproduce())
+    alive = 0
+    for spec in specimen:
+        if spec.alive:
+            specimen[alive] = spec
+            alive += 1
+    del specimen[alive:]
+    
+    for i in range(alive):
+        spec = specimen[i]
+        if spec.reproducing:
+            specimen.append(spec.reproduce())
             spec.reproducing = False
                 
-    return s
+    return specimen
 
 
 # create facade
@@ -97,9 +113,140 @@ class Simulation:
         return [str(x) for x in self.population]
     
 
+# create compact backend for the same facade
+# - population is a bytearray of strategies (0 = dove, 1 = hawk), no object per
+#   animal
+# - an animal survives exactly when its partner is a dove, and every surviving
+#   paired hawk reproduces -> a generation is a handful of bulk byte operations
+# - keeps the ordering of iteration(), so a fixed seed gives the same results
+DOVE, HAWK = 0, 1
+ASSETS = {DOVE: str(Dove()), HAWK: str(Hawk())}
+_PARTNER_IS_DOVE = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+def array_iteration(specimen: bytearray) -> bytearray:
+    half = len(specimen)//2
+    spec1 = bytes(specimen[:half])
+    spec2 = bytes(specimen[half:2*half])
+    rest = specimen[2*half:]
+    
+    s1 = bytes(compress(spec1, spec2.translate(_PARTNER_IS_DOVE)))
+    s2 = bytes(compress(spec2, spec1.translate(_PARTNER_IS_DOVE)))
+    offspring = s1.count(HAWK) + s2.count(HAWK)
+    
+    return bytearray(s1 + s2 + rest + bytes([HAWK]) * offspring)
+
+class ArraySimulation:
+    def __init__(self, hawk_number, dove_number):
+        self.population = bytearray([HAWK]) * hawk_number \
+            + bytearray([DOVE]) * dove_number
+        random.shuffle(self.population)
+    
+    def iterate(self):
+        self.population = array_iteration(self.population)
+        random.shuffle(self.population)
+    
+    def get_assets(self):
+        return [ASSETS[x] for x in self.population]
+
+
+# create parameter sweep on top of the facade
+# - each (hawks, doves, generations, seed) config runs in a worker process
+#   seeded from the config itself -> results do not depend on scheduling
+# - population counts come back as compact arrays instead of animal objects
+# - finished configs are appended to a checkpoint file, so an interrupted sweep
+#   resumes where it stopped
+def run_config(config: tuple) -> tuple:
+    hawk_number, dove_number, generations, seed = config
+    random.seed(seed)
+    sim = ArraySimulation(hawk_number, dove_number)
+    hawks, doves = array('L'), array('L')
+    for _ in range(generations):
+        sim.iterate()
+        hawk_count = sim.population.count(HAWK)
+        hawks.append(hawk_count)
+        doves.append(len(sim.population) - hawk_count)
+    return config, hawks, doves
+
+def load_checkpoint(path: str) -> dict:
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    
+    with open(path, 'rb+') as f:
+        lines = f.readlines()
+        for i, line in enumerate(lines):
+            last = i == len(lines) - 1
+            try:
+                if last and not line.endswith(b'\n'):
+                    raise ValueError('truncated line')
+                row = json.loads(line)
+            except ValueError:
+                # an interrupted sweep can leave a truncated last line -> drop
+                # it, so later appends start on a clean line; a malformed line
+                # in the middle is only skipped
+                if last:
+                    f.truncate(sum(map(len, lines[:i])))
+                continue
+            done[tuple(row['config'])] = (
+                array('L', row['hawks']), array('L', row['doves'])
+            )
+    return done
+
+def sweep(configs: list, workers: int = None, checkpoint: str = None):
+    configs = [tuple(c) for c in configs]
+    done = load_checkpoint(checkpoint)
+    for config in configs:
+        if config in done:
+            yield (config, *done[config])
+    
+    todo = [c for c in configs if c not in done]
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(run_config, c) for c in todo]
+        for future in as_completed(futures):
+            config, hawks, doves = future.result()
+            if checkpoint:
+                with open(checkpoint, 'a') as f:
+                    f.write(json.dumps({
+                        'config': config,
+                        'hawks': hawks.tolist(),
+                        'doves': doves.tolist()
+                    }) + '\n')
+            yield config, hawks, doves
+    finally:
+        # caller stopped early or was interrupted -> drop the queued configs
+        # instead of running them for nothing
+        pool.shutdown(cancel_futures=True)
+
+
+def benchmark(n: int = 1000000) -> None:
+    for cls in (Simulation, ArraySimulation):
+        sim = cls(n // 2, n // 2)
+        tracemalloc.start()
+        start = time.perf_counter()
+        sim.iterate()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{cls.__name__}: {elapsed:.3f}s, peak {peak / 2**20:.1f} MiB '
+              f'per generation at {n} animals')
+
+
 # run method
 if __name__ == '__main__':
     sim = Simulation(10, 10)
     for _ in range(3):
         sim.iterate()
-        print(sim.get_assets())
\ No newline at end of file
+        print(sim.get_assets())
+    
+    sim = ArraySimulation(10, 10)
+    for _ in range(3):
+        sim.iterate()
+        print(sim.get_assets())
+    
+    grid = [(h, d, 5, seed) for h in (10, 100) for d in (10, 100) for seed in (0, 1)]
+    for config, hawks, doves in sweep(grid):
+        print(config, hawks.tolist(), doves.tolist())
+    
+    if '--benchmark' in sys.argv:
+        benchmark()
\ No newline at end of file
@@ -3,6 +3,12 @@
 #   object which is shared by multiple contexts while being indistinguishable
 #   from a "normal" object that is not shared
 
+from array import array
+from collections.abc import Iterable
+from operator import add
+import sys
+import time
+
 
 # create base class
 class BulletContext:
@@ -21,25 +27,123 @@ class BulletContext:
 class BulletFlyweight:
     def __init__(self):
         self.asset = '■■►'
-        self.bullets = []
+        # interning pool keyed on (x, y, z, velocity) -> O(1) lookup, dicts
+        # keep insertion order for print_bullets
+        self.bullets = {}
         
     def bullet_factory(self, x: float, y: float, z: float, velocity: float) \
         -> BulletContext:
-            bull = [b for b in self.bullets if b.x==x and b.y==y and b.z==z and b.velocity==velocity]
-            if not bull:
+            key = (x, y, z, velocity)
+            bull = self.bullets.get(key)
+            if bull is None:
                 bull = BulletContext(x,y,z,velocity)
-                self.bullets.append(bull)
-            else:
-                bull = bull[0]
+                self.bullets[key] = bull
                 
             return bull
+    
+    def bullet_factory_many(self, bullets: Iterable[tuple]) -> list:
+        return [self.bullet_factory(*b) for b in bullets]
         
     def print_bullets(self):
         print('Bullets:')
-        for bullet in self.bullets:
+        for bullet in self.bullets.values():
             print(f'{bullet.x} {bullet.y} {bullet.z} {bullet.velocity}')
 
 
+# create columnar store
+# - keeps one contiguous array per field instead of one object per bullet
+# - bullets are handed out as lightweight index handles
+# - bulk operations work on whole columns at once
+class BulletView:
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index: int):
+        self.store = store
+        self.index = index
+
+    @property
+    def x(self) -> float:
+        return self.store.x[self.index]
+
+    @property
+    def y(self) -> float:
+        return self.store.y[self.index]
+
+    @property
+    def z(self) -> float:
+        return self.store.z[self.index]
+
+    @property
+    def velocity(self) -> float:
+        return self.store.velocity[self.index]
+
+class BulletStore:
+    def __init__(self):
+        self.x = array('d')
+        self.y = array('d')
+        self.z = array('d')
+        self.velocity = array('d')
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def add(self, x: float, y: float, z: float, velocity: float) \
+        -> BulletView:
+            self.x.append(x)
+            self.y.append(y)
+            self.z.append(z)
+            self.velocity.append(velocity)
+            return BulletView(self, len(self.x) - 1)
+
+    def advance(self, dt: float, chunk: int = 1 << 16) -> None:
+        # bullets fly along the x axis
+        # - x is updated in place chunk by chunk, so a frame never allocates
+        #   more than one chunk of temporaries
+        # - without NumPy this is still a Python-level map, not SIMD
+        x, velocity, step = self.x, self.velocity, float(dt).__mul__
+        for i in range(0, len(x), chunk):
+            x[i:i + chunk] = array('d', map(add, x[i:i + chunk],
+                                            map(step, velocity[i:i + chunk])))
+
+    def filter_box(self, low: tuple, high: tuple) -> list:
+        (x0, y0, z0), (x1, y1, z1) = low, high
+        return [
+            BulletView(self, i)
+            for i, (x, y, z) in enumerate(zip(self.x, self.y, self.z))
+            if x0 <= x <= x1 and y0 <= y <= y1 and z0 <= z <= z1
+        ]
+
+    def nbytes(self) -> int:
+        return sum(
+            col.itemsize * len(col)
+            for col in (self.x, self.y, self.z, self.velocity)
+        )
+
+
+def benchmark(n: int = 100000, dt: float = 0.1) -> None:
+    objects = [BulletContext(i, i, i, 1.0) for i in range(n)]
+    store = BulletStore()
+    for i in range(n):
+        store.add(i, i, i, 1.0)
+
+    obj_bytes = sum(
+        sys.getsizeof(b) + sys.getsizeof(b.__dict__)
+        + sum(sys.getsizeof(v) for v in b.__dict__.values())
+        for b in objects
+    )
+    print(f'objects: {obj_bytes / n:.1f} bytes per bullet')
+    print(f'columns: {store.nbytes() / n:.1f} bytes per bullet')
+
+    start = time.perf_counter()
+    for b in objects:
+        b.x = b.x + b.velocity * dt
+    print(f'objects: {time.perf_counter() - start:.4f}s per frame')
+
+    start = time.perf_counter()
+    store.advance(dt)
+    print(f'columns: {time.perf_counter() - start:.4f}s per frame')
+
+
 # run method
 if __name__ == '__main__':
     bf = BulletFlyweight()
@@ -47,5 +151,15 @@ if __name__ == '__main__':
     # adding bullets
     bf.bullet_factory(1,1,1,1)
     bf.bullet_factory(1,2,5,1)
+    bf.bullet_factory_many([(1,1,1,1), (3,2,1,2)])
+
+    bf.print_bullets()
+
+    store = BulletStore()
+    store.add(1,1,1,1)
+    store.add(1,2,5,1)
+    store.advance(0.5)
+    print([(b.x, b.y, b.z) for b in store.filter_box((0,0,0), (2,2,2))])
 
-    bf.print_bullets()
\ No newline at end of file
+    if '--benchmark' in sys.argv:
+        benchmark()
\ No newline at end of file
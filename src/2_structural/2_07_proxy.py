@@ -2,17 +2,115 @@
 #   allows to provide a substitute or placeholder for another object to
 #   represent its functionality
 
+import asyncio
+import json
+import os
+import secrets
+import statistics
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+# create storage backends
+# - plain dict, sharded dict with one lock per shard for concurrent access, or
+#   SQLite file that survives restarts
+# - missing patients raise KeyError on every backend
+class DictBackend:
+    def __init__(self):
+        self._patients = {}
+    
+    def put(self, patient_id: str, data: list) -> None:
+        self._patients[patient_id] = data
+    
+    def get(self, patient_id: str) -> list:
+        return self._patients[patient_id]
+    
+    def get_many(self, patient_ids: list) -> dict:
+        return {i: self._patients[i] for i in patient_ids if i in self._patients}
+
+class ShardedBackend:
+    def __init__(self, shards: int = 16):
+        self._shards = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+    
+    def _shard(self, patient_id: str) -> int:
+        return hash(patient_id) % len(self._shards)
+    
+    def put(self, patient_id: str, data: list) -> None:
+        i = self._shard(patient_id)
+        with self._locks[i]:
+            self._shards[i][patient_id] = data
+    
+    def get(self, patient_id: str) -> list:
+        i = self._shard(patient_id)
+        with self._locks[i]:
+            return self._shards[i][patient_id]
+    
+    def get_many(self, patient_ids: list) -> dict:
+        found = {}
+        for patient_id in patient_ids:
+            try:
+                found[patient_id] = self.get(patient_id)
+            except KeyError:
+                pass
+        return found
+
+class SqliteBackend:
+    def __init__(self, path: str = ':memory:'):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS patients (id TEXT PRIMARY KEY, data TEXT)'
+        )
+    
+    def put(self, patient_id: str, data: list) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO patients VALUES (?, ?)',
+                (patient_id, json.dumps(data))
+            )
+    
+    def get(self, patient_id: str) -> list:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data FROM patients WHERE id = ?', (patient_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(patient_id)
+        return json.loads(row[0])
+    
+    def get_many(self, patient_ids: list) -> dict:
+        # one query for the whole batch
+        placeholders = ','.join('?' * len(patient_ids))
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT id, data FROM patients WHERE id IN ({placeholders})',
+                list(patient_ids)
+            ).fetchall()
+        return {patient_id: json.loads(data) for patient_id, data in rows}
+    
+    def close(self) -> None:
+        self._db.close()
+
 
 # create base class
 class PatientFileManager:
-    def __init__(self):
-        self.__patients = {}
+    def __init__(self, backend=None):
+        self.__patients = backend if backend is not None else DictBackend()
         
     def _add_patient(self, patient_id: str, data: list) -> None:
-        self.__patients[patient_id] = data
+        self.__patients.put(patient_id, data)
         
     def _get_patient(self, patient_id) -> list:
-        return self.__patients[patient_id]
+        return self.__patients.get(patient_id)
+    
+    # missing patients are left out of the result
+    def _get_patients(self, patient_ids: list) -> dict:
+        return self.__patients.get_many(patient_ids)
     
 
 # create proxy class
@@ -39,9 +137,255 @@ class AccessManager(PatientFileManager):
             return [None]
 
 
+# create caching proxy
+# - backing file manager is only created on first access (virtual proxy)
+# - passwords are checked once per session, later calls only look up the token
+# - patient records are kept in a bounded LRU cache with a time to live, writes
+#   through add_patient invalidate the cached record
+class CachingAccessManager(AccessManager):
+    permissions = {
+        'sudo': {'read', 'write'},
+        'totallytheirdoctor': {'read'}
+    }
+    
+    def __init__(self, loader, max_size: int = 1024, ttl: float = 60.0,
+                 session_ttl: float = 3600.0):
+        self._loader = loader
+        self._fm = None
+        self.max_size = max_size
+        self.ttl = ttl
+        self.session_ttl = session_ttl
+        self.stats = {'hits': 0, 'misses': 0}
+        self._latencies = deque(maxlen=10000)
+        self._sessions = OrderedDict()
+        self._cache = OrderedDict()
+        self._writes = 0
+        self._lock = threading.RLock()
+    
+    @property
+    def fm(self) -> PatientFileManager:
+        with self._lock:
+            if self._fm is None:
+                self._fm = self._loader()
+            return self._fm
+    
+    def login(self, password: str) -> str:
+        if password not in self.permissions:
+            print("Wrong password.")
+            return None
+        
+        token = secrets.token_hex(16)
+        now = time.monotonic()
+        with self._lock:
+            # sessions are ordered by expiry, drop the expired ones up front
+            while self._sessions:
+                oldest = next(iter(self._sessions.values()))
+                if oldest[0] > now:
+                    break
+                self._sessions.popitem(last=False)
+            self._sessions[token] = (now + self.session_ttl, self.permissions[password])
+        return token
+    
+    def logout(self, token: str) -> None:
+        with self._lock:
+            self._sessions.pop(token, None)
+    
+    def _allowed(self, token: str, permission: str) -> bool:
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return False
+            if session[0] <= time.monotonic():
+                del self._sessions[token]
+                return False
+            return permission in session[1]
+    
+    def add_patient(self, patient_id: str, data: list, token: str) -> None:
+        if self._allowed(token, 'write'):
+            self.fm._add_patient(patient_id, data)
+            with self._lock:
+                self._writes += 1
+                self._cache.pop(patient_id, None)
+        else:
+            print("Wrong password.")
+    
+    def get_patient(self, patient_id: str, token: str) -> list:
+        if not self._allowed(token, 'read'):
+            print("Only their doctor can access this patients data.")
+            return [None]
+        
+        start = time.perf_counter()
+        with self._lock:
+            entry = self._cache.get(patient_id)
+            hit = entry is not None and entry[0] > start
+            if hit:
+                self._cache.move_to_end(patient_id)
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+                writes = self._writes
+        
+        if hit:
+            data = entry[1]
+        else:
+            # fetch outside the lock, skip caching if a write happened meanwhile
+            data = self.fm._get_patient(patient_id)
+            with self._lock:
+                if writes == self._writes:
+                    self._cache[patient_id] = (start + self.ttl, data)
+                    self._cache.move_to_end(patient_id)
+                    if len(self._cache) > self.max_size:
+                        self._cache.popitem(last=False)
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+        return data
+    
+    def latency_percentiles(self) -> dict:
+        with self._lock:
+            latencies = list(self._latencies)
+        if len(latencies) < 2:
+            return {}
+        q = statistics.quantiles(latencies, n=100)
+        return {'p50': q[49], 'p90': q[89], 'p99': q[98]}
+
+
+# create async proxy
+# - lookups arriving within a short window are coalesced into one batched
+#   backend fetch, which runs in a worker thread (DataLoader-style)
+# - duplicate in-flight lookups share the same future
+class AsyncAccessManager(AccessManager):
+    readers = ('totallytheirdoctor', 'sudo')
+    
+    def __init__(self, fm: PatientFileManager, window: float = 0.002):
+        self.fm = fm
+        self.window = window
+        self.batches = 0
+        self._inflight = {}
+        self._queue = []
+        self._dispatch_task = None
+    
+    async def get_patient(self, patient_id: str, password: str) -> list:
+        if password not in self.readers:
+            print("Only their doctor can access this patients data.")
+            return [None]
+        return await self._load(patient_id)
+    
+    async def get_patients(self, patient_ids: list, password: str) -> list:
+        if password not in self.readers:
+            print("Only their doctor can access this patients data.")
+            return [[None] for _ in patient_ids]
+        return await asyncio.gather(*(self._load(i) for i in patient_ids))
+    
+    def _load(self, patient_id: str) -> asyncio.Future:
+        future = self._inflight.get(patient_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            # results of futures whose callers all went away are still consumed
+            future.add_done_callback(
+                lambda f: f.cancelled() or f.exception()
+            )
+            self._inflight[patient_id] = future
+            self._queue.append(patient_id)
+            if self._dispatch_task is None:
+                self._dispatch_task = asyncio.create_task(self._dispatch())
+        # each caller waits on its own shield, so cancelling one caller doesn't
+        # cancel the lookup shared with the duplicates
+        return asyncio.shield(future)
+    
+    async def _dispatch(self) -> None:
+        patient_ids, found, error = [], {}, None
+        finished = False
+        try:
+            await asyncio.sleep(self.window)
+            patient_ids, self._queue = self._queue, []
+            self._dispatch_task = None
+            self.batches += 1
+            found = await asyncio.to_thread(self.fm._get_patients, patient_ids)
+            finished = True
+        except Exception as e:
+            error = e
+            finished = True
+        finally:
+            # resolve every future of the batch, even if this task is cancelled
+            if self._dispatch_task is asyncio.current_task():
+                patient_ids, self._queue = self._queue, []
+                self._dispatch_task = None
+            for patient_id in patient_ids:
+                future = self._inflight.pop(patient_id, None)
+                if future is None or future.done():
+                    continue
+                if not finished:
+                    future.cancel()
+                elif patient_id in found:
+                    future.set_result(found[patient_id])
+                else:
+                    future.set_exception(error or KeyError(patient_id))
+
+class SlowBackend(DictBackend):
+    # fake backend with artificial latency per call
+    def __init__(self, latency: float = 0.01):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+    
+    def get(self, patient_id: str) -> list:
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().get(patient_id)
+    
+    def get_many(self, patient_ids: list) -> dict:
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().get_many(patient_ids)
+
+async def load_test(requests: int = 1000, patients: int = 100) -> None:
+    backend = SlowBackend()
+    fm = PatientFileManager(backend)
+    for i in range(patients):
+        fm._add_patient(f'patient {i}', [f'record {i}'])
+    ids = [f'patient {i % patients}' for i in range(requests)]
+    
+    start = time.perf_counter()
+    for patient_id in ids[:100]:
+        await asyncio.to_thread(fm._get_patient, patient_id)
+    elapsed = (time.perf_counter() - start) / 100 * requests
+    print(f'one at a time: {requests / elapsed:.0f} lookups/s')
+    
+    backend.calls = 0
+    am = AsyncAccessManager(fm)
+    start = time.perf_counter()
+    await asyncio.gather(*(am.get_patient(i, 'totallytheirdoctor') for i in ids))
+    elapsed = time.perf_counter() - start
+    print(f'batched: {requests / elapsed:.0f} lookups/s, '
+          f'{backend.calls} backend calls for {requests} lookups')
+
+
 # run method
 if __name__ == '__main__':
     am = AccessManager(PatientFileManager())
     am.add_patient('Jessica', ['pneumonia 2020-23-03', 'shortsighted'], 'sudo')
 
-    print(am.get_patient('Jessica', 'totallytheirdoctor'))
\ No newline at end of file
+    print(am.get_patient('Jessica', 'totallytheirdoctor'))
+    
+    path = os.path.join(tempfile.mkdtemp(), 'patients.db')
+    for backend in (ShardedBackend(), SqliteBackend(path)):
+        am = AccessManager(PatientFileManager(backend))
+        am.add_patient('Jessica', ['pneumonia 2020-23-03', 'shortsighted'], 'sudo')
+        print(am.get_patient('Jessica', 'totallytheirdoctor'))
+    
+    # records survive a restart with the SQLite backend
+    backend.close()
+    am = AccessManager(PatientFileManager(SqliteBackend(path)))
+    print(am.get_patient('Jessica', 'sudo'))
+    
+    cam = CachingAccessManager(lambda: PatientFileManager(SqliteBackend(path)))
+    doctor = cam.login('totallytheirdoctor')
+    for _ in range(10):
+        cam.get_patient('Jessica', doctor)
+    cam.add_patient('Jessica', ['flu 2021-02-01'], cam.login('sudo'))
+    print(cam.get_patient('Jessica', doctor), cam.stats, cam.latency_percentiles())
+    
+    aam = AsyncAccessManager(PatientFileManager(SqliteBackend(path)))
+    print(asyncio.run(aam.get_patients(['Jessica', 'Jessica'], 'sudo')))
+    if '--benchmark' in sys.argv:
+        asyncio.run(load_test())
\ No newline at end of file
@@ -0,0 +1,67 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+
+def load_composite():
+    path = Path(__file__).parent.parent / 'src' / '2_structural' / '2_03_composite.py'
+    spec = importlib.util.spec_from_file_location('composite', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+composite = load_composite()
+
+
+def make_tree():
+    phone = composite.Phone(400)
+    inner = composite.Box([phone, composite.Charger(25)])
+    root = composite.Box([inner, composite.Earphones(70)])
+    assert root.return_price() == 495
+    return root, inner, phone
+
+
+def test_price_change_invalidates_ancestors():
+    root, inner, phone = make_tree()
+    phone.price = 450
+    assert inner.return_price() == 475
+    assert root.return_price() == 545
+
+
+def test_add_and_remove_invalidate_ancestors():
+    root, inner, phone = make_tree()
+    charger = composite.Charger(30)
+    inner.add(charger)
+    assert root.return_price() == 525
+
+    inner.remove(phone)
+    assert phone.parent is None
+    assert inner.return_price() == 55
+    assert root.return_price() == 125
+
+
+def test_move_invalidates_both_boxes():
+    root, inner, phone = make_tree()
+    other = composite.Box([])
+    assert other.return_price() == 0
+
+    other.move(phone)
+    assert phone.parent is other
+    assert phone not in inner.contents
+    assert other.return_price() == 400
+    assert root.return_price() == 95
+
+    # subtotals cached before the move were dropped
+    phone.price = 10
+    assert other.return_price() == 10
+    assert root.return_price() == 95
+
+
+def test_add_rejects_item_with_parent():
+    root, inner, phone = make_tree()
+    with pytest.raises(ValueError):
+        root.add(phone)
+    assert phone.parent is inner
+    assert root.return_price() == 495
@@ -0,0 +1,58 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+
+def load_proxy():
+    path = Path(__file__).parent.parent / 'src' / '2_structural' / '2_07_proxy.py'
+    spec = importlib.util.spec_from_file_location('proxy', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+proxy = load_proxy()
+
+
+def make_manager():
+    fm = proxy.PatientFileManager()
+    fm._add_patient('a', ['record a'])
+    fm._add_patient('b', ['record b'])
+    return proxy.AsyncAccessManager(fm)
+
+
+def test_cancelled_caller_does_not_break_batch():
+    async def run():
+        am = make_manager()
+        cancelled = asyncio.create_task(am.get_patient('a', 'sudo'))
+        duplicate = asyncio.create_task(am.get_patient('a', 'sudo'))
+        other = asyncio.create_task(am.get_patient('b', 'sudo'))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        assert await duplicate == ['record a']
+        assert await other == ['record b']
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert am._inflight == {}
+
+        # later lookups still go to the backend
+        assert await am.get_patient('b', 'sudo') == ['record b']
+
+    asyncio.run(run())
+
+
+def test_missing_patient_raises_key_error():
+    async def run():
+        am = make_manager()
+        results = await asyncio.gather(
+            am.get_patient('a', 'sudo'), am.get_patient('missing', 'sudo'),
+            return_exceptions=True
+        )
+        assert results[0] == ['record a']
+        assert isinstance(results[1], KeyError)
+        assert am.batches == 1
+
+    asyncio.run(run())